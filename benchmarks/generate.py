@@ -0,0 +1,73 @@
+import argparse
+import os
+import random
+import subprocess
+
+LOCATIONS = [
+    'reel1/partA/1920x1080', 'reel1/VFX/Hydraulx', 'reel1/VFX/Framestore', 'reel1/VFX/AnimalLogic',
+    'reel1/partB/1920x1080', 'pickups/shot_1ab/1920x1080', 'pickups/shot_2b/1920x1080', 'reel1/partC/1920x1080'
+]
+
+def location_names(count):
+    names = LOCATIONS[:count]
+    for i in range(len(names), count):
+        names.append(f"reel{i // 8 + 2}/part{chr(ord('A') + i % 8)}/1920x1080")
+    return names
+
+def generate_baselight(path, frames, paths=8, gap_rate=0.02, max_gap=48, line_frames=24,
+                       unmatched_rate=0.05, seed=0):
+    rng = random.Random(seed)
+    locations = location_names(paths)
+    per_path = max(1, frames // paths)
+    written = 0
+    with open(path, 'w') as f:
+        for i, location in enumerate(locations):
+            base = f"/baselightfilesystem1/dogman/{location}"
+            frame = rng.randint(1, 100)
+            count = per_path if i < paths - 1 else frames - written
+            line = []
+            for _ in range(count):
+                line.append(frame)
+                frame += 1
+                if rng.random() < gap_rate:
+                    frame += rng.randint(2, max_gap)
+                if len(line) >= line_frames:
+                    line_path = base if rng.random() >= unmatched_rate else f"/baselightfilesystem1/other/{location}"
+                    f.write(f"{line_path} {' '.join(map(str, line))}\n")
+                    line = []
+            if line:
+                f.write(f"{base} {' '.join(map(str, line))}\n")
+            written += count
+    return path
+
+def generate_xytech(path, paths=8, workorder='WO-BENCH'):
+    with open(path, 'w') as f:
+        for i, location in enumerate(location_names(paths)):
+            f.write(f"{location},/hpsans{11 + i % 7}/production/dogman/{location},{workorder}\n")
+    return path
+
+def generate_video(path, seconds=10, fps=24, size='320x240', gop=48):
+    subprocess.run(["ffmpeg", "-y", "-v", "error",
+                    "-f", "lavfi", "-i", f"testsrc=duration={seconds}:size={size}:rate={fps}",
+                    "-f", "lavfi", "-i", f"sine=duration={seconds}",
+                    "-c:v", "libx264", "-g", str(gop), "-c:a", "aac", "-shortest", path],
+                   capture_output=True, check=True)
+    return path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic Baselight, Xytech and video inputs')
+    parser.add_argument('--out-dir', type=str, default='bench_data', help='Output directory')
+    parser.add_argument('--frames', type=int, default=100000, help='Total Baselight frames')
+    parser.add_argument('--paths', type=int, default=8, help='Number of Baselight paths')
+    parser.add_argument('--gap-rate', type=float, default=0.02, help='Probability of a gap after each frame')
+    parser.add_argument('--max-gap', type=int, default=48, help='Largest gap in frames')
+    parser.add_argument('--video-seconds', type=int, default=0, help='Also generate a test video of this length')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    print(generate_baselight(os.path.join(args.out_dir, 'baselight.txt'), args.frames, args.paths,
+                             args.gap_rate, args.max_gap, seed=args.seed))
+    print(generate_xytech(os.path.join(args.out_dir, 'xytech.csv'), args.paths))
+    if args.video_seconds:
+        print(generate_video(os.path.join(args.out_dir, 'video.mp4'), args.video_seconds))
@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shot_processing as sp
+from shot_processing.media import (collect_jobs, cut_shot, extract_shot, extract_thumbnail, extract_thumbnail_batch,
+                                   submit_jobs, thumbnail_batches)
+from shot_processing.optional import optional_import
+from generate import LOCATIONS, generate_baselight, generate_video, generate_xytech
+
+def timed(results, stage, func, *args, items=None):
+    start = time.perf_counter()
+    cpu = time.process_time()
+    value = func(*args)
+    seconds = time.perf_counter() - start
+    count = items(value) if callable(items) else items
+    results[stage] = {
+        'seconds': round(seconds, 6),
+        'cpu_seconds': round(time.process_time() - cpu, 6),
+        'items': count,
+        'items_per_second': round(count / seconds, 1) if count and seconds else None
+    }
+    print(f"  {stage:<16} {seconds:10.4f}s  {count if count is not None else '':>10}")
+    return value
+
+def location_index_for(xytech_file):
+    path_update = {rel_path: full_path for rel_path, full_path, _ in sp.iter_xytech(xytech_file)}
+    return sp.build_location_index(list(path_update), path_update)
+
+def collect_frames(mapped):
+    frames_by_path = {}
+    for _, full_path, _, frames in mapped:
+        frames_by_path.setdefault(full_path, array('i')).extend(frames)
+    return frames_by_path
+
+def unused_frames(frames_by_path, ranges):
+    frame_intervals, used_intervals = {}, {}
+    for path, frames in frames_by_path.items():
+        intervals = frame_intervals.setdefault(path, [])
+        for start_frame, end_frame in sp.frame_runs(frames):
+            sp.add_interval(intervals, start_frame, end_frame)
+    for r in ranges[::2]:
+        sp.add_interval(used_intervals.setdefault(r['path'], []), r['start_frame'], r['end_frame'])
+    return sum(1 for _ in sp.iter_unused_frames(frame_intervals, used_intervals))
+
+def timecodes(frame_count, fps, chunk_size=65536):
+    count = 0
+    for start in range(0, frame_count, chunk_size):
+        count += len(sp.frames_to_timecodes(range(start, min(start + chunk_size, frame_count)), fps))
+    return count
+
+def export_ranges(ranges, sinks):
+    return sp.export_rows(([r['path'], r['range']] for r in ranges), sinks)
+
+def open_database(mongo_uri):
+    if mongo_uri:
+        from pymongo import MongoClient
+        return MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    try:
+        import mongomock
+    except ImportError:
+        return None
+    return mongomock.MongoClient()
+
+def ingest_ranges(database, ranges, batch_size):
+    from shot_processing import db
+    writers = db.open_db_writers(database, batch_size, ingest_id='benchmark')
+    for r in ranges:
+        db.batch_insert(writers['frame_ranges'], dict(sp.range_fields(r['start_frame'], r['end_frame']),
+                                                      path=r['path'], range=r['range']))
+    db.flush_db_writers(writers)
+    return writers['frame_ranges']['written']
+
+def bench_size(frames, args, work_dir):
+    results = {}
+    baselight_file = os.path.join(work_dir, f"baselight_{frames}.txt")
+    generate_baselight(baselight_file, frames, args.paths, args.gap_rate, seed=args.seed)
+    results['input_bytes'] = os.path.getsize(baselight_file)
+
+    xytech_file = os.path.join(work_dir, f"xytech_{args.paths}.csv")
+    generate_xytech(xytech_file, args.paths)
+
+    entries = timed(results, 'parse', lambda: list(sp.iter_baselight(baselight_file)), items=frames)
+    location_index = timed(results, 'xytech', location_index_for, xytech_file, items=args.paths)
+    frames_by_path = timed(results, 'map', lambda: collect_frames(sp.map_locations(entries, location_index)),
+                           items=len(entries))
+    del entries
+    ranges = timed(results, 'coalesce', sp.coalesce_ranges, frames_by_path, items=len)
+    timed(results, 'unused', unused_frames, frames_by_path, ranges, items=lambda count: count)
+    timed(results, 'timecode', timecodes, frames, args.fps, items=frames)
+
+    timed(results, 'export_csv', export_ranges, ranges,
+          [sp.CsvSink(os.path.join(work_dir, 'output.csv'), ['Path', 'Frames'])], items=len(ranges))
+    if args.parquet:
+        if optional_import('pyarrow.parquet') is None:
+            print("pyarrow is not installed, skipping Parquet export")
+        else:
+            timed(results, 'export_parquet', export_ranges, ranges,
+                  [sp.ParquetSink(os.path.join(work_dir, 'output.parquet'), ['Path', 'Frames'])], items=len(ranges))
+    if not args.skip_xlsx:
+        timed(results, 'export_xlsx', export_ranges, ranges,
+              [sp.XlsxSink(os.path.join(work_dir, 'output.xlsx'), 'Frame Ranges', ['Path', 'Frames'])],
+              items=len(ranges))
+
+    client = None if args.skip_db else open_database(args.mongo_uri)
+    if client is not None:
+        db = client[args.db_name]
+        db.frame_ranges.drop()
+        timed(results, 'db_ingest', ingest_ranges, db, ranges, args.db_batch_size, items=len(ranges))
+        db.frame_ranges.drop()
+        client.close()
+    return results
+
+def run_jobs(func, jobs, workers):
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        return collect_jobs(submit_jobs(pool, func, jobs))
+    finally:
+        if pool:
+            pool.shutdown()
+
+def bench_media(args, work_dir):
+    results = {}
+    fps = int(round(args.fps))
+    video_file = os.path.join(work_dir, 'video.mp4')
+    generate_video(video_file, args.video_seconds, args.fps, gop=fps // 2)
+    total_frames = int(args.video_seconds * args.fps)
+    ranges = []
+    for i, start in enumerate(range(fps // 2, total_frames - fps, fps)):
+        end = start + fps // 2
+        ranges.append({'start_frame': start, 'end_frame': end, 'mid_frame': (start + end) // 2,
+                       'thumbnail_path': os.path.join(work_dir, f"thumb_{i}.png"),
+                       'shot_path': os.path.join(work_dir, f"shot_{i}.mp4")})
+    results['ranges'] = len(ranges)
+
+    timed(results, 'thumbnails', run_jobs, extract_thumbnail,
+          [(video_file, r['mid_frame'], args.fps, r['thumbnail_path']) for r in ranges], args.jobs, items=len(ranges))
+    timed(results, 'thumbnails_batch', run_jobs, extract_thumbnail_batch,
+          thumbnail_batches(video_file, args.fps, ranges, args.thumbnail_chunk), args.jobs, items=len(ranges))
+    shot_jobs = [(video_file, r['start_frame'], r['end_frame'], args.fps, r['shot_path']) for r in ranges]
+    timed(results, 'shots_encode', run_jobs, extract_shot, shot_jobs, args.jobs, items=len(ranges))
+    keyframe_times = sp.load_keyframe_index(video_file, os.path.join(work_dir, 'keyframes.json'))
+    keyframes = sorted({round(t * args.fps) for t in keyframe_times})
+    timed(results, 'shots_copy', run_jobs, cut_shot, [job + (keyframes,) for job in shot_jobs], args.jobs,
+          items=len(ranges))
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark each stage of the shot processing pipeline')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='Baselight frame counts to benchmark (up to 10000000)')
+    parser.add_argument('--paths', type=int, default=len(LOCATIONS), help='Number of Baselight paths')
+    parser.add_argument('--gap-rate', type=float, default=0.02, help='Probability of a gap after each frame')
+    parser.add_argument('--fps', type=float, default=24, help='Frame rate for timecodes and video')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--parquet', action='store_true', help='Also time Parquet export')
+    parser.add_argument('--skip-xlsx', action='store_true', help='Skip XLSX export')
+    parser.add_argument('--skip-db', action='store_true', help='Skip MongoDB ingest')
+    parser.add_argument('--mongo-uri', type=str, help='MongoDB URI (defaults to mongomock when installed)')
+    parser.add_argument('--db-name', type=str, default='shot_processor_benchmark', help='Benchmark database name')
+    parser.add_argument('--db-batch-size', type=int, default=1000, help='Documents per MongoDB batch')
+    parser.add_argument('--video-seconds', type=int, default=0, help='Also benchmark extraction on a test video')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Extraction workers')
+    parser.add_argument('--thumbnail-chunk', type=int, default=32, help='Thumbnails per batch pass')
+    parser.add_argument('--work-dir', type=str, help='Directory for generated data (default: temporary)')
+    parser.add_argument('--out', type=str, default='bench_results.json', help='JSON results file')
+    args = parser.parse_args()
+    args.fps = int(args.fps) if args.fps == int(args.fps) else args.fps
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='shot_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': optional_import('numpy') is not None,
+        'pyarrow': optional_import('pyarrow.parquet') is not None,
+        'settings': {k: v for k, v in vars(args).items() if k not in ('out', 'work_dir')},
+        'sizes': {}
+    }
+    try:
+        for frames in args.sizes:
+            print(f"{frames} frames")
+            report['sizes'][str(frames)] = bench_size(frames, args, work_dir)
+        if args.video_seconds:
+            if shutil.which('ffmpeg') and shutil.which('ffprobe'):
+                print(f"{args.video_seconds}s video")
+                report['media'] = bench_media(args, work_dir)
+            else:
+                print("ffmpeg not found, skipping media benchmarks")
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
@@ -0,0 +1,7 @@
+from .baselight import iter_baselight, parse_baselight
+from .exports import CsvSink, ParquetSink, XlsxSink, export, export_rows, open_sinks
+from .locations import DEFAULT_PATH_UPDATE, build_location_index, iter_xytech, map_location, map_locations
+from .media import extract_shots, list_videos, load_keyframe_index, probe_video
+from .ranges import (add_interval, assign_reels, build_range_index, coalesce_ranges, format_range, frame_runs,
+                     iter_unused_frames, parse_range, range_fields)
+from .timecode import frame_to_timecode, frames_to_timecodes, with_timecodes
@@ -0,0 +1,91 @@
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .locations import map_locations
+
+def parse_baselight_line(line, verbose=False):
+    parts = line.split()
+    if not parts:
+        return None
+    frames = []
+    for frame in parts[1:]:
+        try:
+            frames.append(int(frame))
+        except ValueError:
+            if verbose:
+                print(f"Skip frame: {frame}")
+    return parts[0], frames
+
+def iter_baselight(baselight_file, start=0, end=None, verbose=False):
+    with open(baselight_file, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            parsed = parse_baselight_line(line.decode(), verbose)
+            if parsed:
+                yield parsed
+
+def baselight_chunks(baselight_file, workers, chunk_bytes):
+    size = os.path.getsize(baselight_file)
+    step = max(1, min(chunk_bytes, -(-size // workers)))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+def iter_baselight_frames(baselight_file, location_index, start=0, end=None, verbose=False, keep_records=False):
+    entries = iter_baselight(baselight_file, start, end, verbose)
+    for base_path, full_path, matched_location, frames in map_locations(entries, location_index):
+        if not frames:
+            continue
+        record = None
+        if keep_records:
+            record = {
+                'original_path': base_path,
+                'mapped_path': full_path,
+                'matched_location': matched_location,
+                'frames': frames
+            }
+        yield full_path, frames, record
+
+def parse_baselight_chunk(baselight_file, start, end, location_index, verbose=False, keep_records=False):
+    frames_by_path = {}
+    records = []
+    for full_path, frames, record in iter_baselight_frames(baselight_file, location_index, start, end, verbose,
+                                                           keep_records):
+        frames_by_path.setdefault(full_path, array('i')).extend(frames)
+        if record:
+            records.append(record)
+    return frames_by_path, records
+
+def parse_baselight(baselight_file, location_index, workers=1, chunk_bytes=64 * 1024 * 1024, verbose=False,
+                    on_record=None):
+    frames_by_path = {}
+    if workers > 1:
+        def merge(future):
+            chunk_frames, records = future.result()
+            for path, frames in chunk_frames.items():
+                frames_by_path.setdefault(path, array('i')).extend(frames)
+            for record in records:
+                on_record(record)
+
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for start, end in baselight_chunks(baselight_file, workers, chunk_bytes):
+                pending.append(pool.submit(parse_baselight_chunk, baselight_file, start, end, location_index,
+                                           verbose, on_record is not None))
+                if len(pending) >= workers:
+                    merge(pending.popleft())
+            while pending:
+                merge(pending.popleft())
+        return frames_by_path
+
+    for full_path, frames, record in iter_baselight_frames(baselight_file, location_index, verbose=verbose,
+                                                           keep_records=on_record is not None):
+        frames_by_path.setdefault(full_path, array('i')).extend(frames)
+        if record:
+            on_record(record)
+    return frames_by_path
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+def file_fingerprint(path, use_hash=False):
+    stat = os.stat(path)
+    fingerprint = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+    if use_hash:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha1'] = digest.hexdigest()
+    return fingerprint
+
+def cache_key(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+def load_cache(cache_dir, max_bytes, use_hash=False):
+    os.makedirs(cache_dir, exist_ok=True)
+    entries = {}
+    manifest = os.path.join(cache_dir, 'manifest.json')
+    if os.path.exists(manifest):
+        try:
+            with open(manifest) as f:
+                entries = json.load(f)
+        except ValueError:
+            entries = {}
+    return {'dir': cache_dir, 'max_bytes': max_bytes, 'hash': use_hash, 'entries': entries,
+            'fingerprints': {}, 'lock': threading.Lock()}
+
+def video_fingerprint(cache, video_file):
+    with cache['lock']:
+        if video_file not in cache['fingerprints']:
+            fingerprint = file_fingerprint(video_file, cache['hash'])
+            stale = [k for k, e in cache['entries'].items()
+                     if e.get('source') == fingerprint['path'] and e.get('fingerprint') != fingerprint]
+            for key in stale:
+                drop_cache_entry(cache, key)
+            cache['fingerprints'][video_file] = fingerprint
+        return cache['fingerprints'][video_file]
+
+def drop_cache_entry(cache, key):
+    entry = cache['entries'].pop(key, None)
+    if entry and entry.get('file'):
+        try:
+            os.remove(os.path.join(cache['dir'], entry['file']))
+        except OSError:
+            pass
+
+def cache_fetch(cache, key, dest):
+    with cache['lock']:
+        entry = cache['entries'].get(key)
+        if not entry:
+            return False
+        entry['last_used'] = time.time()
+    try:
+        shutil.copyfile(os.path.join(cache['dir'], entry['file']), dest)
+        return True
+    except OSError:
+        with cache['lock']:
+            drop_cache_entry(cache, key)
+        return False
+
+def cache_store(cache, key, src, fingerprint):
+    cached_file = key + os.path.splitext(src)[1]
+    try:
+        shutil.copyfile(src, os.path.join(cache['dir'], cached_file))
+    except OSError:
+        return
+    with cache['lock']:
+        cache['entries'][key] = {'file': cached_file, 'size': os.path.getsize(src), 'last_used': time.time(),
+                                 'source': fingerprint['path'], 'fingerprint': fingerprint}
+
+def cache_get_data(cache, key):
+    with cache['lock']:
+        entry = cache['entries'].get(key)
+        if entry:
+            entry['last_used'] = time.time()
+            return entry['data']
+    return None
+
+def cache_put_data(cache, key, data, fingerprint):
+    with cache['lock']:
+        cache['entries'][key] = {'data': data, 'size': 0, 'last_used': time.time(),
+                                 'source': fingerprint['path'], 'fingerprint': fingerprint}
+
+def save_cache(cache):
+    with cache['lock']:
+        total = sum(e['size'] for e in cache['entries'].values())
+        for key, entry in sorted(cache['entries'].items(), key=lambda item: item[1]['last_used']):
+            if total <= cache['max_bytes']:
+                break
+            if entry['size']:
+                total -= entry['size']
+                drop_cache_entry(cache, key)
+        manifest = os.path.join(cache['dir'], 'manifest.json')
+        with open(manifest + '.tmp', 'w') as f:
+            json.dump(cache['entries'], f)
+        os.replace(manifest + '.tmp', manifest)
@@ -0,0 +1,511 @@
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import os
+import sys
+import uuid
+
+from . import metrics
+from .baselight import parse_baselight
+from .cache import file_fingerprint, load_cache, save_cache
+from .exports import XlsxSink, export_rows, open_sinks
+from .locations import DEFAULT_PATH_UPDATE, build_location_index, iter_xytech
+from .media import (close_extraction_pools, finish_extraction, list_videos, load_keyframe_index, open_extraction_pools,
+                    probe_video, submit_extraction)
+from .ranges import (add_interval, assign_reels, build_range_index, coalesce_ranges, frame_runs, iter_unused_frames,
+                     range_fields)
+from .timecode import frame_to_seconds, frame_to_timecode, frames_to_timecodes, iter_frame_numbers, with_timecodes
+from .vimeo_upload import ACCESS_TOKEN, CLIENT_ID, CLIENT_SECRET, run_uploads, vimeo_client
+
+parser = argparse.ArgumentParser(description='Process Baselight and Xytech files, extract shots, and upload to Vimeo')
+parser.add_argument('--baselight', type=str, default='Baselight_export_spring2025.txt', help='Baselight export file')
+parser.add_argument('--xytech', type=str, help='Xytech file')
+parser.add_argument('--verbose', action='store_true', help='Show verbose output')
+parser.add_argument('--db', type=str, default='db', help='MongoDB database name')
+parser.add_argument('--no-db', action='store_true', help='Skip database operations')
+parser.add_argument('--process', type=str, help='Video file to process')
+parser.add_argument('--batch', type=str, nargs='+', help='Process several videos (files, directories or .txt lists) as reels')
+parser.add_argument('--reel-offsets', type=str, help='JSON file mapping each batch video to its first frame number')
+parser.add_argument('--fps', type=float, default=24.0, help='Frames per second')
+parser.add_argument('--get-timecode', type=int, help='Convert frame number to timecode')
+parser.add_argument('--timecodes', type=str, help='Convert frame numbers from a file (- for stdin) to timecodes')
+parser.add_argument('--output', type=str, help='Export to XLS file')
+parser.add_argument('--vimeo-upload', action='store_true', help='Upload shots to Vimeo')
+parser.add_argument('--unused-frames', action='store_true', help='Export CSV of unused frames')
+parser.add_argument('--jobs', type=int, default=1, help='Number of concurrent ffmpeg workers')
+parser.add_argument('--thumbnail-jobs', type=int, help='Concurrent thumbnail workers (default: --jobs)')
+parser.add_argument('--encode-jobs', type=int, help='Concurrent shot encode workers (default: --jobs)')
+parser.add_argument('--batch-thumbnails', action='store_true', help='Extract all thumbnails in chunked single-decode passes')
+parser.add_argument('--thumbnail-chunk', type=int, default=500, help='Thumbnails per ffmpeg pass in batch mode')
+parser.add_argument('--cut-mode', choices=['encode', 'copy'], default='encode', help='Re-encode shots or stream copy from keyframes')
+parser.add_argument('--cache-dir', type=str, help='Reuse shots, thumbnails and ffprobe results from this cache directory')
+parser.add_argument('--cache-max-mb', type=int, default=10240, help='Cache size limit in MB')
+parser.add_argument('--cache-hash', action='store_true', help='Include a content hash in the source fingerprint')
+parser.add_argument('--parse-workers', type=int, default=1, help='Worker processes for parsing the Baselight export')
+parser.add_argument('--parse-chunk-mb', type=int, default=64, help='Baselight chunk size per parse worker task in MB')
+parser.add_argument('--db-batch-size', type=int, default=1000, help='Documents per MongoDB bulk write')
+parser.add_argument('--db-write-concern', type=str, help='MongoDB write concern for ingest, e.g. 0, 1 or majority')
+parser.add_argument('--ingest-id', type=str, help='Only process frame ranges from this ingest')
+parser.add_argument('--range-start', type=int, help='Only process frame ranges starting at or after this frame')
+parser.add_argument('--range-end', type=int, help='Only process frame ranges ending at or before this frame')
+parser.add_argument('--migrate-ranges', action='store_true', help='Backfill numeric frame fields on stored frame ranges')
+parser.add_argument('--parquet', action='store_true', help='Also write each CSV export as Parquet (needs pyarrow)')
+parser.add_argument('--incremental', action='store_true', help='Upsert ingest records and only export changed frame ranges')
+parser.add_argument('--upload-jobs', type=int, default=1, help='Number of concurrent Vimeo uploads')
+parser.add_argument('--upload-retries', type=int, default=3, help='Retries per Vimeo upload')
+parser.add_argument('--upload-backoff', type=float, default=2.0, help='Initial retry delay in seconds, doubled per attempt')
+parser.add_argument('--vimeo-api-root', type=str, help='Override the Vimeo API root URL')
+parser.add_argument('--profile', action='store_true', help='Print wall time, CPU time and call counts per stage')
+parser.add_argument('--metrics-out', type=str, help='Write profiling metrics to this JSON file')
+parser.add_argument('--trace-out', type=str, help='Write a Chrome trace (chrome://tracing, Perfetto) to this file')
+
+def load_reel_offsets(offsets_file):
+    with open(offsets_file) as f:
+        return json.load(f)
+
+def reel_offset(reel_offsets, video_file):
+    base_name = os.path.splitext(os.path.basename(video_file))[0]
+    for key in (video_file, os.path.abspath(video_file), os.path.basename(video_file), base_name):
+        if key in reel_offsets:
+            return int(reel_offsets[key])
+    return None
+
+def open_reel(video_file, video_info, offset=0):
+    base_name = os.path.splitext(os.path.basename(video_file))[0]
+    output_dir = f"{base_name}_processed"
+    return dict(video_info, video_file=video_file, base_name=base_name, output_dir=output_dir, offset=offset,
+                thumbnails_dir=os.path.join(output_dir, "thumbnails"), shots_dir=os.path.join(output_dir, "shots"),
+                matching_ranges=[], not_matching_ranges=[], single_frames=[])
+
+def add_reel_range(reel, range_doc):
+    start_frame, end_frame = range_doc['start_frame'], range_doc['end_frame']
+    reel_start, reel_end = start_frame - reel['offset'], end_frame - reel['offset']
+    reel['matching_ranges'].append({
+        'path': range_doc['path'],
+        'range': range_doc['range'],
+        'start_frame': reel_start,
+        'end_frame': reel_end,
+        'mid_frame': reel_start + (reel_end - reel_start) // 2,
+        'thumbnail_path': os.path.join(reel['thumbnails_dir'], f"range_{start_frame}_{end_frame}.jpg"),
+        'shot_path': os.path.join(reel['shots_dir'], f"shot_{start_frame}_{end_frame}.mp4")
+    })
+
+def reject_reel_range(reel, range_doc):
+    if range_doc['is_single']:
+        reel['single_frames'].append({
+            'path': range_doc['path'],
+            'frame': range_doc['range'],
+            'reason': "Single frame (not a range)"
+        })
+    else:
+        reel['not_matching_ranges'].append({
+            'path': range_doc['path'],
+            'range': range_doc['range'],
+            'reason': "Exceeds video duration"
+        })
+
+def prepare_reel(args, reel):
+    matching_ranges, fps = reel['matching_ranges'], reel['fps']
+    with metrics.stage('timecodes'):
+        for key in ('start', 'end', 'mid'):
+            timecodes = frames_to_timecodes([r[f'{key}_frame'] for r in matching_ranges], fps)
+            for r, timecode in zip(matching_ranges, timecodes):
+                r[f'{key}_tc'] = timecode
+
+    os.makedirs(reel['thumbnails_dir'], exist_ok=True)
+    os.makedirs(reel['shots_dir'], exist_ok=True)
+
+    if args.cut_mode != 'copy':
+        return None
+    codecs = reel['codecs']
+    if codecs.get('video') != 'h264' or codecs.get('audio') not in (None, 'aac'):
+        print(f"Stream copy needs h264/aac source, re-encoding shots for {reel['video_file']}")
+        return None
+    with metrics.stage('keyframes'):
+        keyframe_times = load_keyframe_index(reel['video_file'], f"{reel['base_name']}_keyframes.json")
+    return sorted({round(t * fps) for t in keyframe_times})
+
+def export_unused_frames(args, frame_intervals, reels, output_dir, base_name):
+    used_intervals = {}
+    for reel in reels:
+        for r in reel['matching_ranges']:
+            add_interval(used_intervals.setdefault(r['path'], []), r['start_frame'] + reel['offset'],
+                         r['end_frame'] + reel['offset'])
+
+    os.makedirs(output_dir, exist_ok=True)
+    unused_frames_csv = os.path.join(output_dir, "unused_frames.csv")
+    unused_headers = ['Frame', 'Path', 'Timecode']
+    unused_rows = with_timecodes(iter_unused_frames(frame_intervals, used_intervals), reels[0]['fps'])
+    unused_count = export_rows(unused_rows, open_sinks(unused_frames_csv, unused_headers, args.parquet))
+    print(f"Exported {unused_count} unused frames {unused_frames_csv}")
+
+    if args.output:
+        unused_xls = f"{base_name}_unused_frames.xlsx"
+        try:
+            unused_rows = with_timecodes(iter_unused_frames(frame_intervals, used_intervals), reels[0]['fps'])
+            export_rows(unused_rows, [XlsxSink(unused_xls, 'Unused Frames', unused_headers, {0: 10, 1: 40, 2: 15})])
+            print(f"Exported unused frames to {unused_xls}")
+        except Exception as e:
+            print(f"Error creating Excel file {unused_xls}: {type(e).__name__}: {e}")
+
+def export_reel(args, reel):
+    output_dir, base_name = reel['output_dir'], reel['base_name']
+    matching_ranges = reel['matching_ranges']
+    not_matching_ranges, single_frames = reel['not_matching_ranges'], reel['single_frames']
+
+    upload_failures = []
+    if args.vimeo_upload and all([ACCESS_TOKEN, CLIENT_ID, CLIENT_SECRET]):
+        v = vimeo_client(args.vimeo_api_root)
+
+        vimeo_links = []
+        with metrics.stage('vimeo'):
+            uploads = run_uploads(v, matching_ranges, os.path.join(output_dir, "vimeo_manifest.json"),
+                                  args.upload_jobs, args.upload_retries, args.upload_backoff)
+        for r, entry in uploads:
+            if entry['status'] == 'uploaded':
+                uri = entry['vimeo_uri']
+                url = f"https://vimeo.com{uri}"
+                vimeo_links.append({'range': r['range'], 'path': r['path'], 'uri': uri, 'url': url})
+                r['vimeo_uri'], r['vimeo_url'] = uri, url
+            else:
+                upload_failures.append({'path': r['path'], 'range': r['range'], 'reason': entry['error']})
+
+        if vimeo_links:
+            export_rows(([link['path'], link['range'], link['uri'], link['url']] for link in vimeo_links),
+                        open_sinks(os.path.join(output_dir, "vimeo_links.csv"),
+                                   ['Path', 'Range', 'Vimeo URI', 'Vimeo URL'], args.parquet))
+
+    not_uploaded_csv = os.path.join(output_dir, "not_uploaded.csv")
+    not_uploaded_rows = itertools.chain(
+        (['Range', r['path'], r['range'], r['reason']] for r in not_matching_ranges),
+        (['Single Frame', f['path'], f['frame'], f['reason']] for f in single_frames),
+        (['Upload', r['path'], r['range'], r['reason']] for r in upload_failures))
+    export_rows(not_uploaded_rows, open_sinks(not_uploaded_csv, ['Type', 'Path', 'Frame/Range', 'Reason'],
+                                              args.parquet))
+
+    print(f"Exported {len(not_matching_ranges)} and {len(single_frames)}")
+
+    output_file_csv = f"{base_name}_matching_ranges.csv"
+    headers = ['Path', 'Frames', 'Start Timecode', 'End Timecode', 'Mid Timecode']
+    if args.vimeo_upload:
+        headers.append('Vimeo URL')
+    export_rows(([r['path'], r['range'], r['start_tc'], r['end_tc'], r['mid_tc']] +
+                 ([r['vimeo_url']] if args.vimeo_upload and 'vimeo_url' in r else [])
+                 for r in matching_ranges),
+                open_sinks(output_file_csv, headers, args.parquet))
+
+    if args.output:
+        xls_file = f"{base_name}_ranges.xlsx"
+        headers = ['Path', 'Frame Range', 'Start Timecode', 'End Timecode', 'Mid Timecode', 'Thumbnail']
+        column_widths = {col: 15 for col in range(6)}
+        if args.vimeo_upload:
+            headers.append('Vimeo URL')
+            column_widths[6] = 30
+
+        try:
+            xls_rows = ([r['path'], r['range'], r['start_tc'], r['end_tc'], r['mid_tc'],
+                         {'image': r['thumbnail_path']} if r['thumbnail_path'] and os.path.exists(r['thumbnail_path']) else None,
+                         {'url': r['vimeo_url']} if args.vimeo_upload and 'vimeo_url' in r else None]
+                        for r in matching_ranges)
+            export_rows(xls_rows, [XlsxSink(xls_file, 'Frame Ranges', headers, column_widths, 80)])
+            print(f"Data exported {xls_file}")
+        except Exception as e:
+            print(f"Error creating Excel file {xls_file}: {type(e).__name__}: {e}")
+
+def run(args):
+    if args.timecodes:
+        writer = csv.writer(sys.stdout)
+        for frame, timecode in with_timecodes(((frame,) for frame in iter_frame_numbers(args.timecodes)), args.fps):
+            writer.writerow([frame, timecode])
+        exit(0)
+
+    if args.get_timecode is not None:
+        print(f"Frame {args.get_timecode} {args.fps} fps = {frame_to_timecode(args.get_timecode, args.fps)}")
+        if args.process and os.path.exists(args.process):
+            frame_file = os.path.join("timecode_extract", f"frame_{args.get_timecode}.jpg")
+            metrics.run_command('ffmpeg.frame', ["ffmpeg", "-y", "-ss", str(frame_to_seconds(args.get_timecode, args.fps)), 
+                            "-i", args.process, "-vframes", "1", "-q:v", "2", frame_file])
+        exit(0)
+
+    db_client, db_name = None, args.db
+    use_db = not args.no_db
+    db_writers = {}
+    ingest_id = f"{datetime.datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    if use_db:
+        from . import db
+        db_client = db.MongoClient('mongodb://localhost:27017/', serverSelectionTimeoutMS=5000)
+        db_writers = db.open_db_writers(db_client[db_name], args.db_batch_size,
+                                        db.parse_write_concern(args.db_write_concern), ingest_id)
+        try:
+            db.ensure_indexes(db_client[db_name])
+        except Exception as e:
+            print(f"Error creating database indexes: {type(e).__name__}: {e}")
+
+    if args.migrate_ranges:
+        if not use_db:
+            print(f"--migrate-ranges needs the database")
+            exit(1)
+        print(f"Migrated {db.migrate_frame_ranges(db_client[db_name], args.db_batch_size)} frame ranges")
+        exit(0)
+
+    if args.process or args.batch:
+        video_files = list_videos(args.batch) if args.batch else [args.process]
+        if not video_files:
+            print(f"No video files found in {' '.join(args.batch)}")
+            exit(1)
+        for video_file in video_files:
+            if not os.path.exists(video_file):
+                print(f"Video file '{video_file}' not found")
+                exit(1)
+        if args.batch and not (use_db and db_client):
+            print(f"--batch needs the database")
+            exit(1)
+        reel_offsets = load_reel_offsets(args.reel_offsets) if args.reel_offsets else None
+    
+        try:
+            result = metrics.run_command('ffmpeg.version', ["ffmpeg", "-version"], text=True)
+        
+            cache = load_cache(args.cache_dir, args.cache_max_mb * 1024 * 1024, args.cache_hash) if args.cache_dir else None
+            reels = []
+            offset = 0
+            for video_file in video_files:
+                video_info = probe_video(video_file, args.fps, cache)
+                if video_info is None:
+                    print(f"Error with {video_file}")
+                    exit(1)
+                reel = open_reel(video_file, video_info, offset)
+                offset += video_info['total_frames']
+                if reel_offsets is not None:
+                    reel['offset'] = reel_offset(reel_offsets, video_file)
+                    if reel['offset'] is None:
+                        print(f"No frame offset for {video_file} in {args.reel_offsets}, skipping")
+                        continue
+                reels.append(reel)
+                print(f"Video: {os.path.basename(video_file)}, Duration: {reel['duration_seconds']:.2f}s, "
+                      f"FPS: {reel['fps']}, Frames: {reel['total_frames']}"
+                      + (f", Offset: {reel['offset']}" if args.batch else ""))
+            
+                if use_db and db_client:
+                    db.batch_insert(db_writers['video_files'], {
+                        'filename': os.path.basename(video_file),
+                        'path': os.path.abspath(video_file),
+                        'duration_seconds': reel['duration_seconds'],
+                        'fps': reel['fps'],
+                        'total_frames': reel['total_frames'],
+                        'frame_offset': reel['offset'],
+                        'processed_date': datetime.datetime.now()
+                    })
+            if not reels:
+                print(f"No videos to process")
+                exit(1)
+            if use_db and db_client:
+                db.flush_db_writers(db_writers)
+        
+            if use_db and db_client:
+                projection = {'_id': 0, 'path': 1, 'range': 1, 'start_frame': 1, 'end_frame': 1, 'is_single': 1}
+                unassigned = []
+                unmigrated = db.count_unmigrated_ranges(db_client[db_name])
+                if unmigrated:
+                    print(f"Warning: {unmigrated} frame ranges have no start_frame/end_frame and are skipped, "
+                          f"run --migrate-ranges to include them")
+                if args.batch:
+                    with metrics.stage('query'):
+                        range_filter = db.range_filter(args.ingest_id, args.range_start, args.range_end)
+                        range_filter.setdefault('start_frame', {'$exists': True})
+                        range_index = build_range_index(db_client[db_name].frame_ranges.find(range_filter, projection))
+                    assigned, unassigned = assign_reels(range_index, [(r['offset'], r['total_frames']) for r in reels])
+                    for reel, range_docs in zip(reels, assigned):
+                        for range_doc in range_docs:
+                            if range_doc['is_single'] or range_doc['end_frame'] > reel['offset'] + reel['total_frames']:
+                                reject_reel_range(reel, range_doc)
+                            else:
+                                add_reel_range(reel, range_doc)
+                    print(f"Assigned {len(range_index['ranges']) - len(unassigned)} frame ranges to {len(reels)} reels")
+                else:
+                    reel = reels[0]
+                    cut_query, rejected_query = db.range_queries(reel['total_frames'], args.ingest_id,
+                                                                 args.range_start, args.range_end)
+                    with metrics.stage('query'):
+                        for range_doc in db_client[db_name].frame_ranges.find(cut_query, projection):
+                            add_reel_range(reel, range_doc)
+                    with metrics.stage('query'):
+                        for range_doc in db_client[db_name].frame_ranges.find(rejected_query, projection):
+                            reject_reel_range(reel, range_doc)
+            
+                pools = open_extraction_pools(args.jobs, args.thumbnail_jobs, args.encode_jobs)
+                try:
+                    with metrics.stage('extract'):
+                        pending = [submit_extraction(pools, reel['video_file'], reel['fps'], reel['matching_ranges'],
+                                                     args.thumbnail_chunk if args.batch_thumbnails else None,
+                                                     prepare_reel(args, reel), cache)
+                                   for reel in reels]
+                        results = [finish_extraction(p) for p in pending]
+                finally:
+                    close_extraction_pools(pools)
+                if cache:
+                    save_cache(cache)
+                for reel, (thumb_results, shot_results) in zip(reels, results):
+                    for r, thumbnail_success, shot_success in zip(reel['matching_ranges'], thumb_results, shot_results):
+                        if not thumbnail_success:
+                            r['thumbnail_path'] = None
+                        elif metrics.current is not None:
+                            metrics.count_metric('bytes_written.thumbnails', os.path.getsize(r['thumbnail_path']))
+                        if not shot_success:
+                            r['shot_path'] = None
+                        elif metrics.current is not None:
+                            metrics.count_metric('bytes_written.shots', os.path.getsize(r['shot_path']))
+            
+                if args.unused_frames:
+                    with metrics.stage('unused_frames'):
+                        frame_intervals = {}
+                        for record in db_client[db_name].baselight.find({}, {'mapped_path': 1, 'frames': 1}):
+                            intervals = frame_intervals.setdefault(record.get('mapped_path', ''), [])
+                            for start_frame, end_frame in frame_runs(record.get('frames', [])):
+                                add_interval(intervals, start_frame, end_frame)
+                    
+                        if args.batch:
+                            export_unused_frames(args, frame_intervals, reels, "batch_processed", "batch")
+                        else:
+                            export_unused_frames(args, frame_intervals, reels, reels[0]['output_dir'],
+                                                 reels[0]['base_name'])
+            
+                for reel in reels:
+                    export_reel(args, reel)
+            
+                if unassigned:
+                    os.makedirs("batch_processed", exist_ok=True)
+                    unassigned_csv = os.path.join("batch_processed", "not_uploaded.csv")
+                    export_rows((['Single Frame' if r['is_single'] else 'Range', r['path'], r['range'],
+                                  "No matching reel"] for r in unassigned),
+                                open_sinks(unassigned_csv, ['Type', 'Path', 'Frame/Range', 'Reason'], args.parquet))
+                    print(f"Exported {len(unassigned)} frame ranges outside every reel to {unassigned_csv}")
+    
+        except Exception as e:
+            print(f"Error processing {'batch' if args.batch else f'video {video_files[0]}'}: {type(e).__name__}: {e}")
+            exit(1)
+    
+        if not (args.baselight or args.xytech):
+            exit(0)
+
+    if args.baselight and not os.path.exists(args.baselight):
+        print(f"Baselight file '{args.baselight}' isnot found")
+        exit(1)
+
+    if args.xytech and not os.path.exists(args.xytech):
+        print(f"Xytech file '{args.xytech}' is not found")
+        exit(1)
+
+    if args.baselight:
+        incremental = args.incremental and use_db and db_client is not None
+        if incremental:
+            source = os.path.abspath(args.baselight)
+            baselight_sha1 = file_fingerprint(args.baselight, True)['sha1']
+            xytech_sha1 = file_fingerprint(args.xytech, True)['sha1'] if args.xytech else None
+            previous_ingest = db_client[db_name].ingests.find_one({'source': source}, sort=[('date_added', db.DESCENDING)])
+            if (previous_ingest and previous_ingest['baselight_sha1'] == baselight_sha1
+                    and previous_ingest.get('xytech_sha1') == xytech_sha1):
+                with open('output.csv', 'w', newline='') as f:
+                    csv.writer(f).writerow(['Path', 'Frames', 'Change'])
+                print(f"No changes since ingest {previous_ingest['ingest_id']}")
+                exit(0)
+    
+        xytech_key = db.XYTECH_KEY if incremental else None
+        baselight_key = db.BASELIGHT_KEY if incremental else None
+    
+        def store_baselight(record):
+            if incremental:
+                record['source'] = source
+                record['line_key'] = db.baselight_line_key(record['original_path'], record['mapped_path'],
+                                                           record['frames'])
+            record['date_added'] = datetime.datetime.now()
+            db.store_record(db_writers['baselight'], record, baselight_key)
+    
+        if args.xytech:
+            xytech_entries = iter_xytech(args.xytech)
+        else:
+            xytech_entries = ((rel_path, full_path, 'Default') for rel_path, full_path in DEFAULT_PATH_UPDATE.items())
+    
+        path_update = {}
+        for rel_path, full_path, workorder in xytech_entries:
+            path_update[rel_path] = full_path
+            if use_db and db_client:
+                db.store_record(db_writers['xytech'], {
+                    'relative_path': rel_path,
+                    'full_path': full_path,
+                    'workorder': workorder,
+                    'date_added': datetime.datetime.now()
+                }, xytech_key)
+    
+        location_index = build_location_index(list(path_update), path_update)
+    
+        with metrics.stage('parse'):
+            frames_by_path = parse_baselight(args.baselight, location_index, args.parse_workers,
+                                             args.parse_chunk_mb * 1024 * 1024, args.verbose,
+                                             store_baselight if use_db and db_client else None)
+
+        frame_count = sum(len(frames) for frames in frames_by_path.values())
+    
+        with metrics.stage('coalesce'):
+            ranges = coalesce_ranges(frames_by_path)
+    
+        if incremental:
+            db.flush_db_writers(db_writers)
+            db_client[db_name].baselight.delete_many({'source': source, 'last_ingest': {'$ne': ingest_id}})
+        
+            previous = {(d['path'], d['start_frame'], d['end_frame']) for d in db_client[db_name].frame_ranges.find(
+                {'source': source}, {'_id': 0, 'path': 1, 'start_frame': 1, 'end_frame': 1})}
+            added, removed = db.range_delta(ranges, previous)
+        
+            export_rows(itertools.chain(([r['path'], r['range'], 'added'] for r in added),
+                                        ([r['path'], r['range'], 'removed'] for r in removed)),
+                        open_sinks('output.csv', ['Path', 'Frames', 'Change'], args.parquet))
+        
+            for r in added:
+                db.batch_insert(db_writers['frame_ranges'], dict(range_fields(r['start_frame'], r['end_frame']),
+                                                                 path=r['path'], range=r['range'], source=source,
+                                                                 date_added=datetime.datetime.now()))
+            for r in removed:
+                db.batch_delete(db_writers['frame_ranges'], {'source': source, 'path': r['path'],
+                                                             'start_frame': r['start_frame'], 'end_frame': r['end_frame']})
+            db.batch_insert(db_writers['ingests'], {
+                'source': source,
+                'baselight_sha1': baselight_sha1,
+                'xytech_sha1': xytech_sha1,
+                'frames': frame_count,
+                'ranges': len(ranges),
+                'added': len(added),
+                'removed': len(removed),
+                'date_added': datetime.datetime.now()
+            })
+            db.flush_db_writers(db_writers)
+            print(f"Processed {frame_count} frames and {len(ranges)} frame ranges ({len(added)} added, {len(removed)} removed)")
+            print(f"Ingest ID: {ingest_id}")
+            exit(0)
+    
+        export_rows(([r['path'], r['range']] for r in ranges), open_sinks('output.csv', ['Path', 'Frames'], args.parquet))
+    
+        if use_db and db_client:
+            for r in ranges:
+                db.batch_insert(db_writers['frame_ranges'], dict(range_fields(r['start_frame'], r['end_frame']),
+                                                                 path=r['path'], range=r['range'],
+                                                                 date_added=datetime.datetime.now()))
+            db.flush_db_writers(db_writers)
+    
+        print(f"Processed {frame_count} frames and {len(ranges)} frame ranges")
+        if use_db and db_client:
+            print(f"Ingest ID: {ingest_id}")
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    if args.profile or args.metrics_out or args.trace_out:
+        metrics.open_metrics(trace=args.trace_out is not None)
+    try:
+        run(args)
+    finally:
+        if metrics.current is not None:
+            metrics.write_metrics(args.profile, args.metrics_out, args.trace_out)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import hashlib
+
+from pymongo import ASCENDING, DESCENDING, DeleteOne, MongoClient, UpdateOne
+from pymongo.write_concern import WriteConcern
+
+from . import metrics
+from .ranges import format_range, parse_range, range_fields
+
+DB_INDEXES = {
+    'video_files': [[('path', ASCENDING)], [('ingest_id', ASCENDING)]],
+    'xytech': [[('relative_path', ASCENDING)], [('ingest_id', ASCENDING)],
+               [('relative_path', ASCENDING), ('full_path', ASCENDING), ('workorder', ASCENDING)]],
+    'baselight': [[('mapped_path', ASCENDING)], [('ingest_id', ASCENDING)],
+                  [('source', ASCENDING), ('line_key', ASCENDING)]],
+    'frame_ranges': [[('path', ASCENDING)], [('start_frame', ASCENDING), ('end_frame', ASCENDING)],
+                     [('ingest_id', ASCENDING)],
+                     [('source', ASCENDING), ('path', ASCENDING), ('start_frame', ASCENDING), ('end_frame', ASCENDING)]],
+    'ingests': [[('source', ASCENDING), ('date_added', DESCENDING)]]
+}
+
+XYTECH_KEY = ('relative_path', 'full_path', 'workorder')
+BASELIGHT_KEY = ('source', 'line_key')
+
+def ensure_indexes(db):
+    for name, indexes in DB_INDEXES.items():
+        for keys in indexes:
+            db[name].create_index(keys)
+
+def parse_write_concern(value):
+    if value is None:
+        return None
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+def open_db_writers(db, batch_size, write_concern=None, ingest_id=None):
+    writers = {}
+    for name in DB_INDEXES:
+        collection = db[name]
+        if write_concern is not None:
+            collection = collection.with_options(write_concern=write_concern)
+        writers[name] = {'collection': collection, 'batch_size': max(1, batch_size), 'docs': [], 'ops': [],
+                         'ingest_id': ingest_id, 'written': 0}
+    return writers
+
+def batch_insert(writer, doc):
+    if writer['ingest_id']:
+        doc['ingest_id'] = writer['ingest_id']
+    writer['docs'].append(doc)
+    if len(writer['docs']) >= writer['batch_size']:
+        flush_writer(writer)
+
+def batch_upsert(writer, key_fields, doc):
+    key = {field: doc[field] for field in key_fields}
+    writer['ops'].append(UpdateOne(key, {'$setOnInsert': dict(doc, ingest_id=writer['ingest_id']),
+                                         '$set': {'last_ingest': writer['ingest_id']}}, upsert=True))
+    if len(writer['ops']) >= writer['batch_size']:
+        flush_writer(writer)
+
+def batch_delete(writer, key):
+    writer['ops'].append(DeleteOne(key))
+    if len(writer['ops']) >= writer['batch_size']:
+        flush_writer(writer)
+
+def store_record(writer, doc, key_fields=None):
+    if key_fields:
+        batch_upsert(writer, key_fields, doc)
+    else:
+        batch_insert(writer, doc)
+
+def flush_writer(writer):
+    if writer['docs']:
+        with metrics.stage('mongo.insert_many'):
+            writer['collection'].insert_many(writer['docs'], ordered=False)
+        metrics.count_metric('mongo.documents_inserted', len(writer['docs']))
+        writer['written'] += len(writer['docs'])
+        writer['docs'] = []
+    if writer['ops']:
+        with metrics.stage('mongo.bulk_write'):
+            writer['collection'].bulk_write(writer['ops'], ordered=False)
+        metrics.count_metric('mongo.bulk_operations', len(writer['ops']))
+        writer['written'] += len(writer['ops'])
+        writer['ops'] = []
+
+def flush_db_writers(writers):
+    for writer in writers.values():
+        flush_writer(writer)
+
+def baselight_line_key(base_path, mapped_path, frames):
+    return hashlib.sha1(f"{base_path} {mapped_path} {' '.join(map(str, frames))}".encode()).hexdigest()
+
+def range_delta(ranges, previous):
+    current = {(r['path'], r['start_frame'], r['end_frame']) for r in ranges}
+    added = [r for r in ranges if (r['path'], r['start_frame'], r['end_frame']) not in previous]
+    removed = [{'path': path, 'range': format_range(start_frame, end_frame),
+                'start_frame': start_frame, 'end_frame': end_frame}
+               for path, start_frame, end_frame in previous if (path, start_frame, end_frame) not in current]
+    removed.sort(key=lambda r: (r['start_frame'], r['path']))
+    return added, removed
+
+def range_filter(ingest_id=None, range_start=None, range_end=None):
+    base = {}
+    if ingest_id:
+        base['ingest_id'] = ingest_id
+    if range_start is not None:
+        base['start_frame'] = {'$gte': range_start}
+    if range_end is not None:
+        base['end_frame'] = {'$lte': range_end}
+    return base
+
+def range_queries(total_frames, ingest_id=None, range_start=None, range_end=None):
+    base = range_filter(ingest_id, range_start, range_end)
+
+    cut_query = dict(base, is_single=False)
+    cut_query['end_frame'] = {'$lte': min(total_frames, range_end) if range_end is not None else total_frames}
+    rejected_query = dict(base, **{'$or': [{'is_single': True}, {'end_frame': {'$gt': total_frames}}]})
+    return cut_query, rejected_query
+
+def count_unmigrated_ranges(db):
+    return db.frame_ranges.count_documents({'start_frame': {'$exists': False}})
+
+def migrate_frame_ranges(db, batch_size):
+    requests, migrated = [], 0
+    for doc in db.frame_ranges.find({'start_frame': {'$exists': False}}, {'range': 1}):
+        try:
+            start_frame, end_frame = parse_range(doc['range'])
+        except (KeyError, ValueError):
+            continue
+        requests.append(UpdateOne({'_id': doc['_id']}, {'$set': range_fields(start_frame, end_frame)}))
+        if len(requests) >= batch_size:
+            db.frame_ranges.bulk_write(requests, ordered=False)
+            migrated += len(requests)
+            requests = []
+    if requests:
+        db.frame_ranges.bulk_write(requests, ordered=False)
+        migrated += len(requests)
+    return migrated
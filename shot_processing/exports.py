@@ -0,0 +1,156 @@
+import csv
+import os
+import time
+
+from . import metrics
+from .optional import optional_import
+
+EXCEL_MAX_ROWS = 1048576
+
+class CsvSink:
+    def __init__(self, path, headers):
+        self.path = path
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+class XlsxSink:
+    def __init__(self, path, sheet_name, headers, column_widths=None, row_height=None):
+        self.path = path
+        import xlsxwriter
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        self.sheet_name = sheet_name
+        self.headers = headers
+        self.column_widths = column_widths or {}
+        self.row_height = row_height
+        self.sheets = 0
+        self.add_sheet()
+
+    def add_sheet(self):
+        self.sheets += 1
+        name = self.sheet_name if self.sheets == 1 else f"{self.sheet_name[:25]} ({self.sheets})"
+        self.ws = self.workbook.add_worksheet(name)
+        for col, width in self.column_widths.items():
+            self.ws.set_column(col, col, width)
+        for col, header in enumerate(self.headers):
+            self.ws.write(0, col, header)
+        self.row = 1
+
+    def write(self, row):
+        if self.row >= EXCEL_MAX_ROWS:
+            self.add_sheet()
+        if self.row_height:
+            self.ws.set_row(self.row, self.row_height)
+        for col, value in enumerate(row):
+            if value is None:
+                continue
+            if isinstance(value, dict) and 'image' in value:
+                try:
+                    self.ws.insert_image(self.row, col, value['image'], {'x_scale': 1, 'y_scale': 1})
+                except Exception:
+                    pass
+            elif isinstance(value, dict) and 'url' in value:
+                self.ws.write_url(self.row, col, value['url'], string=value['url'])
+            else:
+                self.ws.write(self.row, col, value)
+        self.row += 1
+
+    def close(self):
+        self.workbook.close()
+
+class ParquetSink:
+    def __init__(self, path, headers, batch_size=65536):
+        self.path = path
+        self.headers = headers
+        self.batch_size = batch_size
+        self.rows = []
+        self.schema = None
+        self.writer = None
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        pa, pq = optional_import('pyarrow'), optional_import('pyarrow.parquet')
+        width = len(self.headers)
+        rows = [list(row) + [None] * (width - len(row)) for row in self.rows]
+        columns = list(zip(*rows)) if rows else [[] for _ in self.headers]
+        if self.schema is None:
+            fields = []
+            for header, values in zip(self.headers, columns):
+                sample = next((v for v in values if v is not None), None)
+                kind = pa.int64() if isinstance(sample, int) else pa.float64() if isinstance(sample, float) else pa.string()
+                fields.append(pa.field(header, kind))
+            self.schema = pa.schema(fields)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        arrays = [pa.array([v if v is None or field.type != pa.string() else str(v) for v in values], field.type)
+                  for field, values in zip(self.schema, columns)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        if self.rows or self.writer is None:
+            self.flush()
+        self.writer.close()
+
+def open_sinks(csv_path, headers, parquet=False):
+    sinks = [CsvSink(csv_path, headers)]
+    if parquet:
+        if optional_import('pyarrow.parquet') is None:
+            print(f"pyarrow is not installed, skipping {os.path.splitext(csv_path)[0]}.parquet")
+        else:
+            sinks.append(ParquetSink(os.path.splitext(csv_path)[0] + '.parquet', headers))
+    return sinks
+
+def export(rows, path, headers, sheet_name='Sheet1'):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        sink = XlsxSink(path, sheet_name, headers)
+    elif extension == '.parquet':
+        sink = ParquetSink(path, headers)
+    else:
+        sink = CsvSink(path, headers)
+    return export_rows(rows, [sink])
+
+def export_rows(rows, sinks):
+    if metrics.current is not None:
+        return profile_export_rows(rows, sinks)
+    count = 0
+    try:
+        for row in rows:
+            for sink in sinks:
+                sink.write(row)
+            count += 1
+    finally:
+        for sink in sinks:
+            sink.close()
+    return count
+
+def profile_export_rows(rows, sinks):
+    count = 0
+    timings = [[time.perf_counter(), 0.0, 0.0] for _ in sinks]
+    try:
+        for row in rows:
+            for sink, timing in zip(sinks, timings):
+                start, cpu = time.perf_counter(), time.process_time()
+                sink.write(row)
+                timing[1] += time.perf_counter() - start
+                timing[2] += time.process_time() - cpu
+            count += 1
+    finally:
+        for sink, timing in zip(sinks, timings):
+            start, cpu = time.perf_counter(), time.process_time()
+            sink.close()
+            metrics.record_metric('stages', f"export.{type(sink).__name__}", timing[0],
+                                  timing[1] + time.perf_counter() - start, timing[2] + time.process_time() - cpu)
+            metrics.count_metric(f"bytes_written.{type(sink).__name__}", os.path.getsize(sink.path))
+    metrics.count_metric('rows_exported', count)
+    return count
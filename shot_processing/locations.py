@@ -0,0 +1,84 @@
+DEFAULT_PATH_UPDATE = {
+    'reel1/partA/1920x1080': '/hpsans13/production/dogman/reel1/partA/1920x1080',
+    'reel1/VFX/Hydraulx': '/hpsans12/production/dogman/reel1/VFX/Hydraulx',
+    'reel1/VFX/Framestore': '/hpsans13/production/dogman/reel1/VFX/Framestore',
+    'reel1/VFX/AnimalLogic': '/hpsans14/production/dogman/reel1/VFX/AnimalLogic',
+    'reel1/partB/1920x1080': '/hpsans13/production/dogman/reel1/partB/1920x1080',
+    'pickups/shot_1ab/1920x1080': '/hpsans15/production/dogman/pickups/shot_1ab/1920x1080',
+    'pickups/shot_2b/1920x1080': '/hpsans11/production/dogman/pickups/shot_2b/1920x1080',
+    'reel1/partC/1920x1080': '/hpsans17/production/dogman/reel1/partC/1920x1080'
+}
+
+def iter_xytech(xytech_file):
+    with open(xytech_file, 'r') as f:
+        for line in f:
+            parts = line.strip().split(',')
+            if len(parts) >= 2:
+                yield parts[0].strip(), parts[1].strip(), parts[2].strip() if len(parts) > 2 else 'Unknown'
+
+def build_location_index(xytech_locations, path_update):
+    goto, fail, best = [{}], [0], [None]
+    for order, location in enumerate(xytech_locations):
+        state = 0
+        for ch in location:
+            if ch not in goto[state]:
+                goto.append({})
+                fail.append(0)
+                best.append(None)
+                goto[state][ch] = len(goto) - 1
+            state = goto[state][ch]
+        if best[state] is None:
+            best[state] = order
+
+    queue = list(goto[0].values())
+    for state in queue:
+        for ch, child in goto[state].items():
+            link = fail[state]
+            while link and ch not in goto[link]:
+                link = fail[link]
+            fail[child] = goto[link][ch] if ch in goto[link] and goto[link][ch] != child else 0
+            if best[fail[child]] is not None and (best[child] is None or best[fail[child]] < best[child]):
+                best[child] = best[fail[child]]
+            queue.append(child)
+
+    return {'goto': goto, 'fail': fail, 'best': best, 'locations': list(xytech_locations),
+            'path_update': dict(path_update), 'memo': {}}
+
+def first_location(location_index, text):
+    goto, fail, best = location_index['goto'], location_index['fail'], location_index['best']
+    found = best[0]
+    state = 0
+    for ch in text:
+        if found == 0:
+            break
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        if best[state] is not None and (found is None or best[state] < found):
+            found = best[state]
+    return found
+
+def map_location(base_path, location_index):
+    memo = location_index['memo']
+    if base_path in memo:
+        return memo[base_path]
+
+    path_components = base_path.split('/')
+
+    match_path = ""
+    if 'dogman' in path_components:
+        dogman_index = path_components.index('dogman')
+        match_path = '/' + '/'.join(path_components[dogman_index:])
+
+    order = first_location(location_index, match_path)
+    if order is None:
+        memo[base_path] = base_path, None
+    else:
+        location = location_index['locations'][order]
+        memo[base_path] = location_index['path_update'][location], location
+    return memo[base_path]
+
+def map_locations(entries, location_index):
+    for base_path, frames in entries:
+        full_path, matched_location = map_location(base_path, location_index)
+        yield base_path, full_path, matched_location, frames
@@ -0,0 +1,262 @@
+import bisect
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import metrics
+from .cache import cache_fetch, cache_get_data, cache_key, cache_put_data, cache_store, video_fingerprint
+from .timecode import frame_to_seconds
+
+THUMBNAIL_PARAMS = ["-s", "96x74", "-q:v", "2"]
+SHOT_PARAMS = ["-c:v", "libx264", "-preset", "medium", "-crf", "22", "-c:a", "aac", "-b:a", "128k"]
+VIDEO_EXTENSIONS = ('.mov', '.mp4', '.mxf', '.mkv', '.avi', '.m4v')
+
+def list_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            videos.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                          if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS)
+        elif os.path.splitext(path)[1].lower() == '.txt':
+            with open(path) as f:
+                videos.extend(line.strip() for line in f if line.strip())
+        else:
+            videos.append(path)
+    return videos
+
+def probe_video(video_file, fps, cache=None):
+    with metrics.stage('probe'):
+        video_info = None
+        if cache:
+            probe_key = cache_key(video_fingerprint(cache, video_file), 'ffprobe')
+            video_info = cache_get_data(cache, probe_key)
+
+        if video_info is None:
+            result = metrics.run_command('ffprobe.info', ["ffprobe", "-v", "quiet", "-print_format", "json",
+                                                          "-show_format", "-show_streams", video_file], text=True)
+            if not result.stdout:
+                return None
+            video_info = json.loads(result.stdout)
+            if cache:
+                cache_put_data(cache, probe_key, video_info, video_fingerprint(cache, video_file))
+
+    duration_seconds = float(video_info['format'].get('duration', 0))
+    for stream in video_info.get('streams', []):
+        if stream.get('codec_type') == 'video' and 'r_frame_rate' in stream:
+            rate_parts = stream['r_frame_rate'].split('/')
+            if len(rate_parts) == 2 and int(rate_parts[1]) > 0:
+                fps = float(int(rate_parts[0])) / float(int(rate_parts[1]))
+                break
+
+    return {
+        'duration_seconds': duration_seconds,
+        'fps': fps,
+        'total_frames': int(duration_seconds * fps),
+        'codecs': {stream.get('codec_type'): stream.get('codec_name') for stream in video_info.get('streams', [])}
+    }
+
+def extract_thumbnail(video_file, frame, fps, thumbnail_path):
+    try:
+        metrics.run_command('ffmpeg.thumbnail', ["ffmpeg", "-y", "-ss", str(frame_to_seconds(frame, fps)), 
+                    "-i", video_file, "-vframes", "1"] + THUMBNAIL_PARAMS + [thumbnail_path], 
+                    check=True)
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+def extract_shot(video_file, start_frame, end_frame, fps, shot_path):
+    try:
+        metrics.run_command('ffmpeg.encode', ["ffmpeg", "-y", "-ss", str(frame_to_seconds(start_frame, fps)), 
+                    "-i", video_file, "-t", str(frame_to_seconds(end_frame - start_frame + 1, fps))]
+                    + SHOT_PARAMS + [shot_path], 
+                    check=True)
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+def copy_shot(video_file, start_frame, end_frame, fps, shot_path):
+    try:
+        metrics.run_command('ffmpeg.copy', ["ffmpeg", "-y", "-ss", str(frame_to_seconds(start_frame, fps)), 
+                    "-i", video_file, "-t", str(frame_to_seconds(end_frame - start_frame + 1, fps)),
+                    "-frames:v", str(end_frame - start_frame + 1),
+                    "-c", "copy", "-avoid_negative_ts", "make_zero", shot_path], 
+                    check=True)
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+def load_keyframe_index(video_file, index_file):
+    stat = os.stat(video_file)
+    if os.path.exists(index_file):
+        try:
+            with open(index_file) as f:
+                index = json.load(f)
+            if index.get('size') == stat.st_size and index.get('mtime') == stat.st_mtime:
+                return index['keyframes']
+        except (ValueError, KeyError):
+            pass
+
+    result = metrics.run_command('ffprobe.keyframes', ["ffprobe", "-v", "quiet", "-select_streams", "v:0",
+                                                       "-print_format", "json", "-show_entries",
+                                                       "packet=pts_time,flags:format=start_time", video_file], text=True)
+    probe = json.loads(result.stdout or '{}')
+    start_time = float(probe.get('format', {}).get('start_time', 0) or 0)
+    keyframes = sorted(float(p['pts_time']) - start_time for p in probe.get('packets', [])
+                       if 'K' in p.get('flags', '') and p.get('pts_time', 'N/A') != 'N/A')
+
+    with open(index_file, 'w') as f:
+        json.dump({'size': stat.st_size, 'mtime': stat.st_mtime, 'keyframes': keyframes}, f)
+    return keyframes
+
+def cut_shot(video_file, start_frame, end_frame, fps, shot_path, keyframes):
+    first = bisect.bisect_left(keyframes, start_frame)
+    last = bisect.bisect_right(keyframes, end_frame + 1) - 1
+    if first == len(keyframes) or last < 0 or keyframes[first] >= keyframes[last]:
+        return extract_shot(video_file, start_frame, end_frame, fps, shot_path)
+
+    copy_start, copy_end = keyframes[first], keyframes[last] - 1
+    if copy_start == start_frame and copy_end == end_frame:
+        return copy_shot(video_file, start_frame, end_frame, fps, shot_path)
+
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(shot_path))
+    try:
+        segments = []
+        if start_frame < copy_start:
+            segments.append((extract_shot, start_frame, copy_start - 1))
+        segments.append((copy_shot, copy_start, copy_end))
+        if copy_end < end_frame:
+            segments.append((extract_shot, copy_end + 1, end_frame))
+
+        parts = []
+        for cut, segment_start, segment_end in segments:
+            parts.append(os.path.join(tmp_dir, f"part_{len(parts)}.mp4"))
+            if not cut(video_file, segment_start, segment_end, fps, parts[-1]):
+                return extract_shot(video_file, start_frame, end_frame, fps, shot_path)
+        concat_list = os.path.join(tmp_dir, "concat.txt")
+        with open(concat_list, 'w') as f:
+            f.writelines(f"file '{os.path.abspath(part)}'\n" for part in parts)
+        metrics.run_command('ffmpeg.concat', ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-auto_convert", "1",
+                                              "-i", concat_list, "-c", "copy", "-tag:v", "avc3", shot_path],
+                            check=True)
+        return True
+    except subprocess.CalledProcessError:
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def extract_thumbnail_batch(video_file, frames, fps, destinations):
+    first = frames[0]
+    select = '+'.join(f"eq(n,{frame - first})" for frame in frames)
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(destinations[first][0]))
+    try:
+        metrics.run_command('ffmpeg.thumbnail_batch', ["ffmpeg", "-y", "-ss", str(frame_to_seconds(first, fps)),
+                        "-i", video_file, "-vf", f"select='{select}'", "-vsync", "0", "-frames:v", str(len(frames)),
+                        "-start_number", "0"] + THUMBNAIL_PARAMS + [os.path.join(tmp_dir, "thumb_%06d.jpg")])
+        results = {}
+        for i, frame in enumerate(frames):
+            extracted = os.path.join(tmp_dir, f"thumb_{i:06d}.jpg")
+            results[frame] = os.path.exists(extracted)
+            if results[frame]:
+                for thumbnail_path in destinations[frame]:
+                    shutil.copyfile(extracted, thumbnail_path)
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def thumbnail_batches(video_file, fps, ranges, chunk_size):
+    destinations = {}
+    for r in ranges:
+        destinations.setdefault(r['mid_frame'], []).append(r['thumbnail_path'])
+    frames = sorted(destinations)
+    return [(video_file, frames[i:i + chunk_size], fps, destinations)
+            for i in range(0, len(frames), chunk_size)]
+
+def submit_jobs(executor, func, jobs):
+    if executor is None:
+        return [func(*job) for job in jobs]
+    return [executor.submit(func, *job) for job in jobs]
+
+def collect_jobs(results):
+    return [r.result() if isinstance(r, Future) else r for r in results]
+
+def open_extraction_pools(jobs=1, thumbnail_jobs=None, encode_jobs=None):
+    thumbnail_jobs = thumbnail_jobs or jobs
+    encode_jobs = encode_jobs or jobs
+    if thumbnail_jobs > 1 or encode_jobs > 1:
+        return ThreadPoolExecutor(max_workers=thumbnail_jobs), ThreadPoolExecutor(max_workers=encode_jobs)
+    return None, None
+
+def close_extraction_pools(pools):
+    for pool in pools:
+        if pool:
+            pool.shutdown()
+
+def submit_extraction(pools, video_file, fps, ranges, thumbnail_chunk=None, keyframes=None, cache=None):
+    thumb_pool, encode_pool = pools
+    thumb_keys, shot_keys = {}, {}
+    thumb_todo, shot_todo = ranges, ranges
+    fingerprint = None
+    if cache:
+        fingerprint = video_fingerprint(cache, video_file)
+        cut_mode = 'copy' if keyframes is not None else 'encode'
+        for i, r in enumerate(ranges):
+            key = cache_key(fingerprint, 'thumbnail', r['mid_frame'], fps, THUMBNAIL_PARAMS)
+            if not cache_fetch(cache, key, r['thumbnail_path']):
+                thumb_keys[i] = key
+            key = cache_key(fingerprint, 'shot', r['start_frame'], r['end_frame'], fps, cut_mode, SHOT_PARAMS)
+            if not cache_fetch(cache, key, r['shot_path']):
+                shot_keys[i] = key
+        thumb_todo = [ranges[i] for i in thumb_keys]
+        shot_todo = [ranges[i] for i in shot_keys]
+
+    shot_args = [(video_file, r['start_frame'], r['end_frame'], fps, r['shot_path']) for r in shot_todo]
+    if keyframes is not None:
+        shot_func = cut_shot
+        shot_args = [job + (keyframes,) for job in shot_args]
+    else:
+        shot_func = extract_shot
+    if thumbnail_chunk:
+        thumb_func = extract_thumbnail_batch
+        thumb_args = thumbnail_batches(video_file, fps, thumb_todo, thumbnail_chunk)
+    else:
+        thumb_func = extract_thumbnail
+        thumb_args = [(video_file, r['mid_frame'], fps, r['thumbnail_path']) for r in thumb_todo]
+
+    return {'ranges': ranges, 'cache': cache, 'fingerprint': fingerprint, 'thumbnail_chunk': thumbnail_chunk,
+            'thumb_keys': thumb_keys, 'shot_keys': shot_keys, 'thumb_todo': thumb_todo,
+            'thumb_results': submit_jobs(thumb_pool, thumb_func, thumb_args),
+            'shot_results': submit_jobs(encode_pool, shot_func, shot_args)}
+
+def finish_extraction(pending):
+    ranges, cache = pending['ranges'], pending['cache']
+    thumb_keys, shot_keys = pending['thumb_keys'], pending['shot_keys']
+    thumb_results, shot_results = collect_jobs(pending['thumb_results']), collect_jobs(pending['shot_results'])
+
+    if pending['thumbnail_chunk']:
+        extracted = {}
+        for batch in thumb_results:
+            extracted.update(batch)
+        thumb_results = [extracted.get(r['mid_frame'], False) for r in pending['thumb_todo']]
+    if not cache:
+        return thumb_results, shot_results
+
+    thumb_done = dict(zip(thumb_keys, thumb_results))
+    shot_done = dict(zip(shot_keys, shot_results))
+    for i, r in enumerate(ranges):
+        if thumb_done.get(i):
+            cache_store(cache, thumb_keys[i], r['thumbnail_path'], pending['fingerprint'])
+        if shot_done.get(i):
+            cache_store(cache, shot_keys[i], r['shot_path'], pending['fingerprint'])
+    return ([thumb_done.get(i, i not in thumb_keys) for i in range(len(ranges))],
+            [shot_done.get(i, i not in shot_keys) for i in range(len(ranges))])
+
+def extract_shots(video_file, fps, ranges, jobs=1, thumbnail_jobs=None, encode_jobs=None, thumbnail_chunk=None,
+                  keyframes=None, cache=None):
+    pools = open_extraction_pools(jobs, thumbnail_jobs, encode_jobs)
+    try:
+        return finish_extraction(submit_extraction(pools, video_file, fps, ranges, thumbnail_chunk, keyframes, cache))
+    finally:
+        close_extraction_pools(pools)
@@ -0,0 +1,102 @@
+import contextlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+current = None
+
+def open_metrics(trace=False):
+    global current
+    current = {'start': time.perf_counter(), 'stages': {}, 'commands': {}, 'subprocesses': [], 'counters': {},
+               'events': [] if trace else None, 'lock': threading.Lock()}
+    return current
+
+def record_metric(group, name, start, wall, cpu, details=None):
+    with current['lock']:
+        entry = current[group].setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                                 'max_wall_seconds': 0.0})
+        entry['calls'] += 1
+        entry['wall_seconds'] += wall
+        entry['cpu_seconds'] += cpu
+        entry['max_wall_seconds'] = max(entry['max_wall_seconds'], wall)
+        if details is not None:
+            current['subprocesses'].append(dict(details, name=name, wall_seconds=wall, cpu_seconds=cpu))
+        if current['events'] is not None:
+            current['events'].append({'name': name, 'cat': group, 'ph': 'X', 'pid': os.getpid(),
+                                      'tid': threading.get_ident(), 'ts': (start - current['start']) * 1e6,
+                                      'dur': wall * 1e6, 'args': details or {}})
+
+def count_metric(name, value=1):
+    if current is None:
+        return
+    with current['lock']:
+        current['counters'][name] = current['counters'].get(name, 0) + value
+
+def cpu_time():
+    return time.process_time() if threading.current_thread() is threading.main_thread() else time.thread_time()
+
+
+@contextlib.contextmanager
+def stage(name):
+    if current is None:
+        yield
+        return
+    start, cpu = time.perf_counter(), cpu_time()
+    try:
+        yield
+    finally:
+        record_metric('stages', name, start, time.perf_counter() - start, cpu_time() - cpu)
+
+def run_command(name, cmd, check=False, text=False):
+    if current is None or not hasattr(os, 'wait4'):
+        return subprocess.run(cmd, capture_output=True, check=check, text=text)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        process = subprocess.Popen(cmd, stdout=out, stderr=err)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read(), err.read()
+    record_metric('commands', name, start, time.perf_counter() - start, usage.ru_utime + usage.ru_stime,
+                  {'target': cmd[-1], 'returncode': process.returncode})
+    if text:
+        stdout, stderr = stdout.decode(errors='replace'), stderr.decode(errors='replace')
+    result = subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+    if check:
+        result.check_returncode()
+    return result
+
+def metrics_report():
+    return {
+        'wall_seconds': time.perf_counter() - current['start'],
+        'stages': current['stages'],
+        'commands': current['commands'],
+        'subprocesses': current['subprocesses'],
+        'counters': current['counters']
+    }
+
+def print_metrics(report):
+    print(f"{'Stage':<32} {'Calls':>7} {'Wall s':>10} {'CPU s':>10} {'Max s':>9}")
+    for group in ('stages', 'commands'):
+        for name, entry in sorted(report[group].items(), key=lambda item: -item[1]['wall_seconds']):
+            print(f"{name:<32} {entry['calls']:>7} {entry['wall_seconds']:>10.3f} {entry['cpu_seconds']:>10.3f} "
+                  f"{entry['max_wall_seconds']:>9.3f}")
+    for name, value in sorted(report['counters'].items()):
+        print(f"{name:<32} {value:>7}")
+    print(f"Total {report['wall_seconds']:.3f}s")
+
+def write_metrics(profile=False, metrics_out=None, trace_out=None):
+    report = metrics_report()
+    if profile:
+        print_metrics(report)
+    if metrics_out:
+        with open(metrics_out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if trace_out:
+        with open(trace_out, 'w') as f:
+            json.dump({'traceEvents': current['events'], 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,11 @@
+import importlib
+
+modules = {}
+
+def optional_import(name):
+    if name not in modules:
+        try:
+            modules[name] = importlib.import_module(name)
+        except ImportError:
+            modules[name] = None
+    return modules[name]
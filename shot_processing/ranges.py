@@ -0,0 +1,98 @@
+import bisect
+import heapq
+
+from .optional import optional_import
+
+def format_range(start_frame, end_frame):
+    return f"{start_frame}-{end_frame}" if start_frame != end_frame else str(start_frame)
+
+def parse_range(range_str):
+    start_frame, _, end_frame = str(range_str).partition('-')
+    return int(start_frame), int(end_frame or start_frame)
+
+def range_fields(start_frame, end_frame):
+    return {'start_frame': start_frame, 'end_frame': end_frame, 'is_single': start_frame == end_frame}
+
+def frame_runs(frames):
+    np = optional_import('numpy')
+    if np is not None:
+        values = np.sort(np.asarray(frames))
+        if not values.size:
+            return []
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+        breaks = np.flatnonzero(np.diff(values) != 1) + 1
+        starts = values[np.concatenate(([0], breaks))]
+        ends = values[np.concatenate((breaks - 1, [values.size - 1]))]
+        return list(zip(starts.tolist(), ends.tolist()))
+
+    runs = []
+    for frame in sorted(set(frames)):
+        if runs and frame == runs[-1][1] + 1:
+            runs[-1][1] = frame
+        else:
+            runs.append([frame, frame])
+    return [(start, end) for start, end in runs]
+
+def coalesce_ranges(frames_by_path):
+    ranges = []
+    for path, frames in frames_by_path.items():
+        for start_frame, end_frame in frame_runs(frames):
+            ranges.append({
+                'path': path,
+                'range': format_range(start_frame, end_frame),
+                'start_frame': start_frame,
+                'end_frame': end_frame
+            })
+    ranges.sort(key=lambda r: (r['start_frame'], r['path']))
+    return ranges
+
+def add_interval(intervals, start, end):
+    i = bisect.bisect_left(intervals, [start, start])
+    if i > 0 and intervals[i - 1][1] >= start - 1:
+        i -= 1
+        start = intervals[i][0]
+    j = i
+    while j < len(intervals) and intervals[j][0] <= end + 1:
+        end = max(end, intervals[j][1])
+        j += 1
+    intervals[i:j] = [[start, end]]
+
+def subtract_intervals(intervals, removed):
+    j = 0
+    for start, end in intervals:
+        while j < len(removed) and removed[j][1] < start:
+            j += 1
+        current, k = start, j
+        while k < len(removed) and removed[k][0] <= end:
+            if removed[k][0] > current:
+                yield current, removed[k][0] - 1
+            current = max(current, removed[k][1] + 1)
+            k += 1
+        if current <= end:
+            yield current, end
+
+def expand_intervals(intervals, path):
+    for start, end in intervals:
+        for frame in range(start, end + 1):
+            yield frame, path
+
+def iter_unused_frames(frame_intervals, used_intervals):
+    streams = [expand_intervals(subtract_intervals(intervals, used_intervals.get(path, [])), path)
+               for path, intervals in frame_intervals.items()]
+    return heapq.merge(*streams)
+
+def build_range_index(ranges):
+    ranges = sorted(ranges, key=lambda r: (r['start_frame'], r['end_frame']))
+    return {'starts': [r['start_frame'] for r in ranges], 'ranges': ranges}
+
+def ranges_starting_in(range_index, start, end):
+    lo = bisect.bisect_left(range_index['starts'], start)
+    return lo, bisect.bisect_left(range_index['starts'], end, lo)
+
+def assign_reels(range_index, windows):
+    assigned, used = [], bytearray(len(range_index['ranges']))
+    for offset, total_frames in windows:
+        lo, hi = ranges_starting_in(range_index, offset, offset + total_frames)
+        assigned.append(range_index['ranges'][lo:hi])
+        used[lo:hi] = b'\x01' * (hi - lo)
+    return assigned, [r for r, flag in zip(range_index['ranges'], used) if not flag]
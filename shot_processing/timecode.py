@@ -0,0 +1,76 @@
+import itertools
+import sys
+
+from .optional import optional_import
+
+def timecode_base(fps):
+    nominal = int(round(fps))
+    drop = nominal // 15 if nominal != fps and nominal in (30, 60) else 0
+    return nominal, drop
+
+def drop_frame_adjust(frame_num, nominal, drop):
+    frames_per_10min = nominal * 600 - drop * 9
+    frames_per_min = nominal * 60 - drop
+    tens, rem = divmod(frame_num, frames_per_10min)
+    return frame_num + drop * 9 * tens + drop * max(0, (rem - drop) // frames_per_min)
+
+def frame_to_timecode(frame_num, fps):
+    nominal, drop = timecode_base(fps)
+    frame_num = int(frame_num)
+    if drop:
+        frame_num = drop_frame_adjust(frame_num, nominal, drop)
+    total_seconds, frames = divmod(frame_num, nominal)
+    hours, total_seconds = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(total_seconds, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{';' if drop else ':'}{frames:02d}"
+
+def frames_to_timecodes(frames, fps):
+    np = optional_import('numpy')
+    if np is None:
+        return [frame_to_timecode(frame, fps) for frame in frames]
+
+    nominal, drop = timecode_base(fps)
+    values = np.asarray(frames, dtype=np.int64)
+    if not values.size:
+        return []
+    if drop:
+        tens, rem = np.divmod(values, nominal * 600 - drop * 9)
+        values = values + drop * 9 * tens + drop * np.maximum(0, (rem - drop) // (nominal * 60 - drop))
+    total_seconds, frame_part = np.divmod(values, nominal)
+    hours, total_seconds = np.divmod(total_seconds, 3600)
+    minutes, seconds = np.divmod(total_seconds, 60)
+    if values.min() < 0 or hours.max() > 99:
+        return [frame_to_timecode(frame, fps) for frame in frames]
+
+    chars = np.empty((values.size, 11), dtype=np.uint8)
+    for col, part in ((0, hours), (3, minutes), (6, seconds), (9, frame_part)):
+        chars[:, col] = part // 10 + ord('0')
+        chars[:, col + 1] = part % 10 + ord('0')
+    chars[:, 2] = chars[:, 5] = ord(':')
+    chars[:, 8] = ord(';' if drop else ':')
+    return chars.view('S11').ravel().astype(str).tolist()
+
+def with_timecodes(rows, fps, chunk_size=65536):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        for row, timecode in zip(chunk, frames_to_timecodes([row[0] for row in chunk], fps)):
+            yield row + (timecode,)
+
+def iter_frame_numbers(source):
+    f = sys.stdin if source == '-' else open(source)
+    try:
+        for line in f:
+            for token in line.replace(',', ' ').split():
+                try:
+                    yield int(token)
+                except ValueError:
+                    pass
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def frame_to_seconds(frame_num, fps):
+    return frame_num / fps
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .media import collect_jobs, submit_jobs
+
+CLIENT_ID = ''
+CLIENT_SECRET = ''
+ACCESS_TOKEN = ''
+
+def vimeo_client(api_root=None):
+    import vimeo
+    client = vimeo.VimeoClient(token=ACCESS_TOKEN, key=CLIENT_ID, secret=CLIENT_SECRET)
+    if api_root:
+        client.API_ROOT = api_root
+    return client
+
+def load_upload_manifest(manifest_file):
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file) as f:
+                return json.load(f)
+        except ValueError:
+            pass
+    return {}
+
+def save_upload_manifest(manifest, manifest_file):
+    with open(manifest_file + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_file + '.tmp', manifest_file)
+
+def upload_shot(client, shot_path, title, description, retries, backoff, uri=None):
+    error = None
+    for attempt in range(retries + 1):
+        try:
+            if uri is None:
+                with metrics.stage('vimeo.upload'):
+                    uri = client.upload(shot_path)
+                metrics.count_metric('bytes_uploaded', os.path.getsize(shot_path))
+            with metrics.stage('vimeo.patch'):
+                client.patch(uri, data={'name': title, 'description': description})
+            return uri, None, attempt + 1
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                metrics.count_metric('vimeo.retries')
+                time.sleep(backoff * 2 ** attempt)
+    return uri, error, retries + 1
+
+def run_uploads(client, ranges, manifest_file, jobs=1, retries=3, backoff=2.0):
+    manifest = load_upload_manifest(manifest_file)
+    lock = threading.Lock()
+
+    def upload(i, r):
+        key = f"{r['path']}:{r['range']}"
+        entry = manifest.get(key, {})
+        if entry.get('vimeo_uri') and entry.get('status') == 'uploaded':
+            return key, entry
+        title = f"Shot {i+1}: {os.path.basename(r['path'])} - {r['range']}"
+        description = f"Path: {r['path']}\nRange: {r['range']}\nTC: {r['start_tc']} to {r['end_tc']}"
+        uri, error, attempts = upload_shot(client, r['shot_path'], title, description, retries, backoff,
+                                           entry.get('vimeo_uri'))
+        entry = {'shot_path': r['shot_path'], 'vimeo_uri': uri, 'attempts': attempts,
+                 'status': 'failed' if error else 'uploaded', 'error': error}
+        with lock:
+            manifest[key] = entry
+            save_upload_manifest(manifest, manifest_file)
+        if error:
+            print(f"Error uploading {r['shot_path']}: {error}")
+        else:
+            print(f"  Uploaded: https://vimeo.com{uri}")
+        return key, entry
+
+    pending = [(i, r) for i, r in enumerate(ranges) if r['shot_path'] and os.path.exists(r['shot_path'])]
+    pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        results = collect_jobs(submit_jobs(pool, upload, pending))
+    finally:
+        if pool:
+            pool.shutdown()
+    return [(r, entry) for (_, r), (_, entry) in zip(pending, results)]